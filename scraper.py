@@ -1,24 +1,35 @@
 """Scraps various informations about movies on Allocine.fr
 
 Attributes:
+    EXTRACTORS (tuple): Functions extracting the movie attributes from a movie card.
+    MOVIE_ID_LINK (re.Pattern): Compiled regex capturing movie IDs in raw pages.
+    NON_DIGITS (re.Pattern): Compiled regex matching everything but digits.
+    *_CSS (soupsieve.SoupSieve): Compiled CSS selectors for the movie card fields.
     scraper (object): Instance of the main class.
 """
 
 import bs4
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
 import psycopg2
 import dateparser
 
-import requests
+import httpx
+import soupsieve as sv
+import asyncio
+import csv
 import re
 import os
 import time
 import logging
-from typing import Union
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import List, Tuple, Union
 import psycopg2
 import dateparser
 import datetime
+from email.utils import parsedate_to_datetime
 
 # better logging
 logging.getLogger().setLevel(logging.INFO)
@@ -29,6 +40,270 @@ from dotenv import load_dotenv, find_dotenv
 
 load_dotenv(find_dotenv())
 
+# strips everything but digits, e.g. from movie links
+NON_DIGITS = re.compile(r"\D+")
+
+# CSS selectors used on every movie card, compiled once
+MOVIE_LINK_CSS = sv.compile("div.content-title a[href]")
+TITLE_CSS = sv.compile("div.content-title")
+DATE_CSS = sv.compile("span.date")
+SPACER_CSS = sv.compile("span.spacer")
+INFO_CSS = sv.compile("div.meta-body-info")
+GENRES_CSS = sv.compile('span[class*="=="]')
+DIRECTION_CSS = sv.compile("div.meta-body-direction")
+DIRECTORS_CSS = sv.compile("a.blue-link, span.blue-link")
+CAST_CSS = sv.compile("div.meta-body-actor")
+ACTORS_CSS = sv.compile("a, span")
+RATINGS_CSS = sv.compile("div.rating-item")
+NOTE_CSS = sv.compile("span.stareval-note")
+SYNOPSIS_CSS = sv.compile("div.synopsis")
+
+# movie links straight from the raw page, when we only need the IDs
+MOVIE_ID_LINK = re.compile(rb"fichefilm_gen_cfilm=(\d+)\.html")
+
+
+def extract_ids_fast(page: bytes) -> List[int]:
+    """Extracts the movie IDs of a result page without parsing it.
+
+    The IDs are read from the movie links in the raw source code, which is
+    much cheaper than building the page DOM.
+
+    Args:
+        page (bytes): Source code of a Allocine.fr webpage.
+
+    Returns:
+        List[int]: The movie IDs, in order of appearance and without duplicates.
+    """
+
+    movie_ids = dict.fromkeys(MOVIE_ID_LINK.findall(page))
+
+    return [int(movie_id) for movie_id in movie_ids]
+
+
+def _get_movie_id(movie: bs4.element.Tag) -> Union[int, None]:
+    """Private function to retrieve the movie ID according to Allociné.
+
+    Args:
+        movie (bs4.element.Tag): Parser results with the movie informations.
+
+    Returns:
+        Union[int, None]: The movie ID according to Allociné.
+    """
+
+    movie_link = MOVIE_LINK_CSS.select_one(movie)
+    if movie_link is None:
+        return None
+
+    movie_id = NON_DIGITS.sub("", movie_link["href"])
+
+    return int(movie_id) if movie_id else None
+
+
+def _get_movie_title(movie: bs4.element.Tag) -> Union[str, None]:
+    """Private function to retrieve the movie title.
+
+    Args:
+        movie (bs4.element.Tag): Parser results with the movie informations.
+
+    Returns:
+        Union[str, None]: The movie title.
+    """
+
+    movie_title = TITLE_CSS.select_one(movie)
+    if movie_title is None:
+        return None
+
+    return movie_title.text.strip()
+
+
+def _get_movie_release_date(movie: bs4.element.Tag) -> Union[datetime.datetime, None]:
+    """Private function to retrieve the movie release date.
+
+    Args:
+        movie (bs4.element.Tag): Parser results with the movie informations.
+
+    Returns:
+        Union[datetime.datetime, None]: The movie release date.
+    """
+
+    movie_date = DATE_CSS.select_one(movie)
+    if movie_date is None:
+        return None
+
+    # dateparser already gives None back for unparsable dates
+    movie_date = dateparser.parse(movie_date.text.strip(), date_formats=["%d %B %Y"])
+    return movie_date
+
+
+def _get_movie_duration(movie: bs4.element.Tag) -> Union[int, None]:
+    """Private function to retrieve the movie duration.
+
+    Args:
+        movie (bs4.element.Tag): Parser results with the movie informations.
+
+    Returns:
+        Union[int, None]: The movie duration in minutes.
+    """
+
+    spacer = SPACER_CSS.select_one(movie)
+    if spacer is None or not isinstance(spacer.next_sibling, str):
+        return None
+
+    movie_duration = spacer.next_sibling.strip()
+    if not movie_duration:
+        return None
+
+    try:
+        duration_timedelta = pd.to_timedelta(movie_duration).components
+    except ValueError:
+        return None
+
+    movie_duration = duration_timedelta.hours * 60 + duration_timedelta.minutes
+
+    return movie_duration
+
+
+def _get_movie_genres(movie: bs4.element.Tag) -> Union[str, None]:
+    """Private function to retrieve the movie genre(s).
+
+    Args:
+        movie (bs4.element.Tag): Parser results with the movie informations.
+
+    Returns:
+        Union[str, None]: The movie genre(s).
+    """
+
+    movie_infos = INFO_CSS.select_one(movie)
+    if movie_infos is None:
+        return None
+
+    # genres are the spans with an obfuscated class token ending with "=="
+    movie_genres = [
+        genre.text
+        for genre in GENRES_CSS.select(movie_infos)
+        if any(token.endswith("==") for token in genre["class"])
+    ]
+
+    return ", ".join(movie_genres)
+
+
+def _get_movie_directors(movie: bs4.element.Tag) -> Union[str, None]:
+    """Private function to retrieve the movie director(s).
+
+    Args:
+        movie (bs4.element.Tag): Parser results with the movie informations.
+
+    Returns:
+        Union[str, None]: The movie director(s).
+    """
+
+    movie_direction = DIRECTION_CSS.select_one(movie)
+    if movie_direction is None:
+        return None
+
+    movie_directors = [link.text for link in DIRECTORS_CSS.select(movie_direction)]
+
+    return ", ".join(movie_directors)
+
+
+def _get_movie_actors(movie: bs4.element.Tag) -> Union[str, None]:
+    """Private function to retrieve the movie actor(s).
+
+    Args:
+        movie (bs4.element.Tag): Parser results with the movie informations.
+
+    Returns:
+        Union[str, None]: The movie actor(s).
+    """
+
+    movie_cast = CAST_CSS.select_one(movie)
+    if movie_cast is None:
+        return None
+
+    movie_actors = [actor.text for actor in ACTORS_CSS.select(movie_cast)][1:]
+
+    return ", ".join(movie_actors)
+
+
+def _get_movie_ratings(
+    movie: bs4.element.Tag,
+) -> Tuple[Union[float, None], Union[float, None]]:
+    """Private function to retrieve the movie ratings from the press and the spectators.
+
+    Both ratings live in the same "rating-item" blocks, so they are read in
+    a single pass over them.
+
+    Args:
+        movie (bs4.element.Tag): Parser results with the movie informations.
+
+    Returns:
+        Tuple[Union[float, None], Union[float, None]]: The movie ratings
+            according to the press and to the spectators.
+    """
+
+    press_rating = spec_rating = None
+
+    # walk the rating items lazily, only until both ratings are found
+    for ratings in RATINGS_CSS.iselect(movie):
+
+        rating_type = ratings.text
+        is_press_rating = "Presse" in rating_type
+
+        # skip the other kinds of ratings before looking for their note
+        if not is_press_rating and "Spectateurs" not in rating_type:
+            continue
+
+        note = NOTE_CSS.select_one(ratings)
+        if note is None:
+            continue
+
+        try:
+            rating = float(note.text.replace(",", "."))
+        except ValueError:
+            continue
+
+        if is_press_rating:
+            if press_rating is None:
+                press_rating = rating
+        elif spec_rating is None:
+            spec_rating = rating
+
+        if press_rating is not None and spec_rating is not None:
+            break
+
+    return press_rating, spec_rating
+
+
+def _get_movie_summary(movie: bs4.element.Tag) -> Union[str, None]:
+    """Private function to retrieve the movie summary.
+
+    Args:
+        movie (bs4.element.Tag): Parser results with the movie informations.
+
+    Returns:
+        Union[str, None]: The movie summary.
+    """
+
+    movie_summary = SYNOPSIS_CSS.select_one(movie)
+    if movie_summary is None:
+        return None
+
+    return movie_summary.text.strip()
+
+
+# functions filling the movie_infos columns in order, ratings fill two of them
+EXTRACTORS = (
+    _get_movie_id,
+    _get_movie_title,
+    _get_movie_release_date,
+    _get_movie_duration,
+    _get_movie_genres,
+    _get_movie_directors,
+    _get_movie_actors,
+    _get_movie_ratings,
+    _get_movie_summary,
+)
+
 
 class AlloCineScraper(object):
 
@@ -36,17 +311,46 @@ class AlloCineScraper(object):
 
     Attributes:
         allocine_url (str): Base URL where we will get movie attributes.
+        client (httpx.Client): HTTP/2 client multiplexing requests to Allociné.fr.
         dataset (pd.DataFrame): Pandas DataFrame with all the scraped informations.
+        dataset_columns (tuple): Columns of the dataset, only the ID with fast_ids.
+        dataset_file (object): Opened CSV file where movies are written as they get scraped.
         dataset_name (str): CSV Filename of the Pandas DataFrame that hosts all our movie results.
+        dataset_writer (object): CSV writer on top of dataset_file.
         db_conn (object): Connection to our postgres database through psycopg2.
         db_cursor (object): Cursor to our postgres database through our psycopg2's connection.
-        human_pause (int): Time to wait before each page scraped.
-        movie_infos (list): List of movie attributes we're interested in.
+        fast_ids (bool): Whether we only scrap the movie IDs, without parsing pages.
+        fetch_workers (int): How many pages can be downloaded at the same time.
+        http_headers (dict): HTTP headers sent with every request to Allociné.fr.
+        http_limits (httpx.Limits): Connection pool limits towards Allociné.fr.
+        http_timeout (httpx.Timeout): Timeouts of the requests to Allociné.fr.
+        human_pause (int): Minimum time to wait between two page requests.
+        max_retries (int): How many times a failed request is retried.
+        movie_cards (SoupStrainer): Only part of a page we parse, the movie cards.
+        movie_infos (tuple): Movie attributes we're interested in.
         number_of_pages (int): How many pages to scrap on Allociné.fr.
+        page_encoding (str): Character encoding of the Allociné.fr pages.
+        retry_backoff (float): Base time in sec to wait before retrying a request.
+        retry_statuses (tuple): HTTP status codes worth retrying a request for.
     """
 
     allocine_url = "https://www.allocine.fr/films/?page="
-    movie_infos = [
+    http_headers = {
+        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:76.0) Gecko/20100101 Firefox/76.0",
+        "Accept-Encoding": "gzip, deflate, br",
+    }
+    http_limits = httpx.Limits(max_keepalive_connections=8, max_connections=16)
+    http_timeout = httpx.Timeout(30.0, connect=5.0)
+    max_retries = 3
+    retry_backoff = 0.5
+    retry_statuses = (429, 500, 502, 503, 504)
+    fetch_workers = 8
+    page_encoding = "utf-8"
+    # the strainer sees the raw class attribute while parsing, hence the split
+    movie_cards = SoupStrainer(
+        "li", class_=lambda classes: classes is not None and "mdl" in classes.split()
+    )
+    movie_infos = (
         "id",
         "title",
         "release_date",
@@ -57,16 +361,14 @@ class AlloCineScraper(object):
         "press_rating",
         "spec_rating",
         "summary",
-    ]
-
-    # store the full movie results
-    dataset = pd.DataFrame(columns=movie_infos)
+    )
 
     def __init__(
         self,
         number_of_pages: int = 50,
         dataset_name: str = "allocine.csv",
         human_pause: int = 10,
+        fast_ids: bool = False,
     ) -> None:
         """Initializes our Scraper class.
 
@@ -74,6 +376,7 @@ class AlloCineScraper(object):
             number_of_pages (int, optional): How many pages to scrap on Allociné.fr. Default: 50.
             dataset_name (str, optional): Filename of the Pandas DataFrame as CSV. Default: allocine.csv
             human_pause (int, optional): Time to wait before each page scraped. Default: 10 sec.
+            fast_ids (bool, optional): Only scrap the movie IDs. Default: False.
 
         Raises:
             Exception: Exists the scraper if the arguments are not appropriate.
@@ -94,6 +397,37 @@ class AlloCineScraper(object):
 
         self.human_pause = human_pause
 
+        if not isinstance(fast_ids, bool):
+            raise Exception("fast_ids must be a boolean.")
+
+        self.fast_ids = fast_ids
+
+        # with fast_ids, pages are searched with a regex and only IDs are kept.
+        # _read_page parses a downloaded page, _parse_page saves its results.
+        if self.fast_ids:
+            self.dataset_columns = ("id",)
+            self._read_page = extract_ids_fast
+            self._parse_page = self._save_movie_ids
+        else:
+            self.dataset_columns = self.movie_infos
+            self._read_page = self._make_soup
+            self._parse_page = self._parse_list_page
+
+        # scraped movies, turned into a DataFrame once scraping is over
+        self._rows = []
+        self.dataset = pd.DataFrame(columns=self.dataset_columns)
+
+        # movies are streamed to the CSV file once scraping starts
+        self.dataset_file = None
+        self.dataset_writer = None
+
+        # next moment we are allowed to hit Allociné, shared by every fetch
+        self._fetch_lock = threading.Lock()
+        self._next_fetch = time.monotonic()
+
+        # set when scraping stops, wakes up the threads waiting for their slot
+        self._stop_fetching = threading.Event()
+
         # let's connect to the postgres database, shall we?
         self.db_conn = psycopg2.connect(
             host="db",
@@ -104,286 +438,393 @@ class AlloCineScraper(object):
         # psycopg2 cursor
         self.db_cursor = self.db_conn.cursor()
 
+        # HTTP/2 client, every page shares the same TCP/TLS connection
+        self.client = httpx.Client(
+            headers=self.http_headers,
+            timeout=self.http_timeout,
+            transport=httpx.HTTPTransport(
+                http2=True, limits=self.http_limits, retries=self.max_retries
+            ),
+        )
+
         logging.info("Initializing Allocine Scraper..")
         logging.info("- Number of pages to scrap: %d", self.number_of_pages)
         logging.info("- Time to wait between pages: %d sec", self.human_pause)
+        logging.info("- Pages downloaded concurrently: %d", self.fetch_workers)
         logging.info("- Results will be stored in: %s", self.dataset_name)
+        logging.info("- Only scraping movie IDs: %s", self.fast_ids)
 
-    def _get_page(self, page_number: int) -> requests.models.Response:
-        """Private method to get the full content of a webpage.
+    def _reserve_fetch_slot(self, delay: float = 0) -> float:
+        """Private method to book the next request slot on Allociné.fr.
+
+        Slots are human_pause seconds apart, whatever the number of threads or
+        coroutines fetching pages, and a slot already in the past is free.
 
         Args:
-            page_number (int): Number of the page on Allociné.fr.
+            delay (float, optional): Minimum time in sec before the slot. Default: 0.
 
         Returns:
-            requests.models.Response: Full source code of the asked webpage.
+            float: Time in sec to wait before sending the request.
         """
 
-        response = requests.get(self.allocine_url + str(page_number))
-        return response
+        with self._fetch_lock:
+            now = time.monotonic()
+            slot = max(now + delay, self._next_fetch)
+            self._next_fetch = slot + self.human_pause
 
-    def start_scraping_movies(self) -> None:
-        """Starts the scraping process.
-        """
+        return slot - now
 
-        logging.info("Starting scraping movies from Allocine...")
-
-        for number in range(1, self.number_of_pages):
+    def _retry_delay(
+        self, response: httpx.Response, attempt: int
+    ) -> Union[float, None]:
+        """Private method to decide whether a request to Allociné.fr is retried.
 
-            logging.info(f"Fetching Page {number}/{self.number_of_pages}")
+        Allociné being overloaded or rate limiting us is worth retrying, after an
+        exponential backoff or the Retry-After it asked for, whichever is longer.
 
-            # get the plain text source code of the page
-            response = self._get_page(number)
+        Args:
+            response (httpx.Response): Response we just got from Allociné.fr.
+            attempt (int): Number of retries already done for this request.
 
-            # parse each page results and get attributes
-            self._parse_list_page(response)
+        Returns:
+            Union[float, None]: Time in sec to wait before retrying, None to give up.
+        """
 
-            logging.info(
-                f"Done scraping page #{number}. Waiting {self.human_pause} sec before the next one.."
-            )
+        if response.status_code not in self.retry_statuses:
+            return None
+
+        if attempt >= self.max_retries:
+            return None
+
+        delay = self.retry_backoff * 2 ** attempt
+
+        # Retry-After is either a number of seconds or an HTTP date
+        retry_after = response.headers.get("Retry-After", "").strip()
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        elif retry_after:
+            try:
+                retry_date = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                retry_date = None
+            if retry_date is not None:
+                if retry_date.tzinfo is None:
+                    retry_date = retry_date.replace(tzinfo=datetime.timezone.utc)
+                now = datetime.datetime.now(datetime.timezone.utc)
+                delay = max(delay, (retry_date - now).total_seconds())
+
+        logging.warning(
+            "Allociné answered %d for %s, retrying in %.1f sec at least",
+            response.status_code,
+            response.url,
+            delay,
+        )
 
-            # let's look a fucking human being
-            time.sleep(self.human_pause)
+        return delay
 
-        # we're done here, closing postgres connection
-        self.db_cursor.close()
-        self.db_conn.close()
+    def _get_page(self, page_number: int) -> httpx.Response:
+        """Private method to get the full content of a webpage.
 
-        logging.info("Done scraping Allocine.")
-        logging.info(f"Results are stored in {self.dataset_name}.")
+        Args:
+            page_number (int): Number of the page on Allociné.fr.
 
-    def _parse_list_page(self, page: requests.models.Response) -> None:
-        """Private method to parse a single result page from Allociné.fr.
+        Returns:
+            httpx.Response: Full source code of the asked webpage.
 
-        Args:
-            page (str): Source code of a Allocine.fr webpage.
+        Raises:
+            CancelledError: Scraping stopped while we were waiting for our turn.
+            httpx.HTTPStatusError: Allociné still answered an error after retrying.
         """
 
-        parser = BeautifulSoup(page.content, "html.parser")
+        page_url = self.allocine_url + str(page_number)
+        delay = 0.0
 
-        # iterate through each "movie" card
-        for movie in parser.find_all("li", class_="mdl"):
+        for attempt in range(self.max_retries + 1):
 
-            # store temporarly all the movie datas
-            movie_datas = []
+            # let's look like a human being, retries included, without holding
+            # other threads back while we wait for our turn
+            wait = self._reserve_fetch_slot(delay)
+            if self._stop_fetching.wait(max(wait, 0)):
+                raise CancelledError(f"Scraping stopped before page {page_number}.")
 
-            # get every info we're interested in
-            for info in self.movie_infos:
+            logging.info(f"Fetching Page {page_number}/{self.number_of_pages}")
 
-                # take care of unavailable infos for some movies
-                try:
-                    scraped_info = getattr(self, "_get_movie_" + info)(movie)
-                except:
-                    scraped_info = None
+            response = self.client.get(page_url)
 
-                # store the movie attribute
-                movie_datas.append(scraped_info)
+            # back off when Allociné is overloaded or rate limits us
+            delay = self._retry_delay(response, attempt)
+            if delay is None:
+                break
 
-            # add movie infos to the dataframe
-            self.dataset.loc[len(self.dataset)] = movie_datas
+        # never save an error page as a page without movies
+        response.raise_for_status()
 
-            # add movie infos to the postgres database
-            self._insert_movie_to_db(movie_datas)
+        return response
 
-        # just to be safe, save after every page
-        self.dataset.to_csv("files/" + self.dataset_name, index=False)
+    def start_scraping_movies(self) -> None:
+        """Starts the scraping process.
+        """
 
-    def _insert_movie_to_db(self, movie_datas: list) -> None:
-        """Private method to insert an individual movie to the postgres db.
+        logging.info("Starting scraping movies from Allocine...")
 
-        Args:
-            movie_datas (list): The movie datas we just scraped.
-        """
+        self._open_dataset_file()
 
-        self.db_cursor.execute(
-            """INSERT INTO public.movies
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT DO NOTHING
-            """,
-            tuple(movie_datas),
+        # download pages in background threads, but parse them here one
+        # after the other so the dataset only has a single writer
+        executor = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        pages = deque(
+            executor.submit(self._get_page, number)
+            for number in range(1, self.number_of_pages)
         )
 
-        self.db_conn.commit()
+        try:
+            for number in range(1, self.number_of_pages):
 
-    def _get_movie_id(self, movie: bs4.element.Tag) -> int:
-        """Private method to retrieve the movie ID according to Allociné.
+                # forget each page once saved, so its results can be freed
+                page = pages.popleft()
 
-        Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+                # parse each page results and get attributes
+                self._parse_page(self._read_page(page.result().content))
 
-        Returns:
-            int: The movie ID according to Allociné.
-        """
+                logging.info(f"Done scraping page #{number}.")
+        finally:
+            # on errors or Ctrl+C, don't fetch the remaining pages for nothing
+            self._stop_fetching.set()
+            for page in pages:
+                page.cancel()
+            executor.shutdown()
 
-        movie_id = re.sub(
-            r"\D", "", movie.find("div", {"class": "content-title"}).a["href"]
-        )
+            self._stop_scraping()
 
-        return int(movie_id)
+        logging.info("Done scraping Allocine.")
+        logging.info(f"Results are stored in {self.dataset_name}.")
 
-    def _get_movie_title(self, movie: bs4.element.Tag) -> str:
-        """Private method to retrieve the movie title.
+    async def _get_page_async(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        page_number: int,
+    ) -> Tuple[int, bytes]:
+        """Private coroutine to get the full content of a webpage.
 
         Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+            client (httpx.AsyncClient): HTTP/2 client multiplexing requests to Allociné.fr.
+            semaphore (asyncio.Semaphore): Bounds how many pages are downloaded at once.
+            page_number (int): Number of the page on Allociné.fr.
 
         Returns:
-            str: The movie title.
+            Tuple[int, bytes]: Number of the page and its full source code.
+
+        Raises:
+            httpx.HTTPStatusError: Allociné still answered an error after retrying.
         """
 
-        movie_title = movie.find("div", {"class": "content-title"}).text.strip()
+        page_url = self.allocine_url + str(page_number)
+        delay = 0.0
 
-        return movie_title
+        async with semaphore:
 
-    def _get_movie_release_date(self, movie: bs4.element.Tag) -> datetime.datetime:
-        """Private method to retrieve the movie release date.
+            for attempt in range(self.max_retries + 1):
 
-        Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+                # same politeness rule as the threaded scraping
+                wait = self._reserve_fetch_slot(delay)
+                if wait > 0:
+                    await asyncio.sleep(wait)
 
-        Returns:
-            datetime.datetime: The movie release date.
-        """
+                logging.info(f"Fetching Page {page_number}/{self.number_of_pages}")
 
-        movie_date = movie.find("span", {"class": "date"}).text.strip()
-        movie_date = dateparser.parse(movie_date, date_formats=["%d %B %Y"])
-        return movie_date
+                response = await client.get(page_url)
 
-    def _get_movie_duration(self, movie: bs4.element.Tag) -> int:
-        """Private method to retrieve the movie duration.
+                # back off when Allociné is overloaded or rate limits us
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    break
 
-        Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+        # never save an error page as a page without movies
+        response.raise_for_status()
 
-        Returns:
-            int: The movie duration in minutes.
+        return page_number, response.content
+
+    async def scrape_async(self) -> None:
+        """Starts the scraping process, downloading pages with asyncio.
+
+        Pages are parsed as soon as they are downloaded, in whatever order
+        they arrive, while the other downloads keep going.
         """
 
-        movie_duration = movie.find("span", {"class": "spacer"}).next_sibling.strip()
-        duration_timedelta = pd.to_timedelta(movie_duration).components
-        movie_duration = duration_timedelta.hours * 60 + duration_timedelta.minutes
+        logging.info("Starting scraping movies from Allocine asynchronously...")
 
-        return movie_duration
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.fetch_workers)
 
-    def _get_movie_genres(self, movie: bs4.element.Tag) -> str:
-        """Private method to retrieve the movie genre(s).
+        self._open_dataset_file()
 
-        Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+        try:
+            async with httpx.AsyncClient(
+                headers=self.http_headers,
+                timeout=self.http_timeout,
+                transport=httpx.AsyncHTTPTransport(
+                    http2=True, limits=self.http_limits, retries=self.max_retries
+                ),
+            ) as client:
 
-        Returns:
-            str: The movie genre(s).
-        """
+                fetches = [
+                    asyncio.create_task(
+                        self._get_page_async(client, semaphore, number)
+                    )
+                    for number in range(1, self.number_of_pages)
+                ]
 
-        movie_genres = [
-            genre.text
-            for genre in movie.find(
-                "div", {"class": "meta-body-item meta-body-info"}
-            ).find_all(
-                "span", class_=re.compile(r".*==$"),
-            )
-        ]
+                try:
+                    for fetch in asyncio.as_completed(fetches):
 
-        return ", ".join(movie_genres)
+                        number, content = await fetch
 
-    def _get_movie_directors(self, movie: bs4.element.Tag) -> str:
-        """Private method to retrieve the movie director(s).
+                        # parse pages off the event loop so downloads keep going
+                        page = await loop.run_in_executor(
+                            None, self._read_page, content
+                        )
 
-        Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+                        # get attributes from each page results
+                        self._parse_page(page)
 
-        Returns:
-            str: The movie director(s).
-        """
+                        logging.info(f"Done scraping page #{number}.")
+                finally:
+                    # on errors or Ctrl+C, don't fetch the remaining pages for
+                    # nothing, and let them stop before the client is closed
+                    for fetch in fetches:
+                        fetch.cancel()
+                    await asyncio.gather(*fetches, return_exceptions=True)
+        finally:
+            self._stop_scraping()
 
-        movie_directors = [
-            link.text
-            for link in movie.find(
-                "div", {"class": "meta-body-item meta-body-direction light"}
-            ).find_all(["a", "span"], class_=re.compile(r".*blue-link$"))
-        ]
+        logging.info("Done scraping Allocine.")
+        logging.info(f"Results are stored in {self.dataset_name}.")
 
-        return ", ".join(movie_directors)
+    def _open_dataset_file(self) -> None:
+        """Private method to create the CSV file where movies are streamed.
 
-    def _get_movie_actors(self, movie: bs4.element.Tag) -> str:
-        """Private method to retrieve the movie actor(s).
+        Only done once scraping starts, so a run failing early (e.g. when the
+        database is not ready yet) doesn't wipe the results of the previous one.
+        """
 
-        Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+        self.dataset_file = open(
+            "files/" + self.dataset_name, "w", newline="", encoding="utf-8"
+        )
+        self.dataset_writer = csv.writer(self.dataset_file)
+        self.dataset_writer.writerow(self.dataset_columns)
 
-        Returns:
-            str: The movie actor(s).
+    def _stop_scraping(self) -> None:
+        """Private method to build the final dataset and release our resources.
+
+        Also called when scraping fails, the dataset then holds the movies
+        scraped so far.
         """
 
-        movie_actors = [
-            actor.text
-            for actor in movie.find(
-                "div", {"class": "meta-body-item meta-body-actor light"}
-            ).find_all(["a", "span"])
-        ][1:]
+        # build the full movie results in one go
+        self.dataset = pd.DataFrame(self._rows, columns=self.dataset_columns)
 
-        return ", ".join(movie_actors)
+        # we're done here, closing csv file, postgres connection and http client
+        self.dataset_file.close()
+        self.db_cursor.close()
+        self.db_conn.close()
+        self.client.close()
 
-    def _get_movie_press_rating(self, movie: bs4.element.Tag) -> Union[float, None]:
-        """Private method to retrieve the movie rating according to the press.
+    def _make_soup(self, page: bytes) -> BeautifulSoup:
+        """Private method to parse the movie cards of a result page from Allociné.fr.
 
         Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+            page (bytes): Source code of a Allocine.fr webpage.
 
         Returns:
-            Union[float, None]: The movie rating according to the press.
+            BeautifulSoup: Parser results with the movie cards only.
         """
 
-        # get all the available ratings
-        movie_ratings = movie.find_all("div", class_="rating-item")
+        # Allociné serves UTF-8: saying so up front spares BeautifulSoup from
+        # sniffing the whole document to guess its encoding. Everything but
+        # the movie cards is skipped while parsing.
+        return BeautifulSoup(
+            page,
+            "lxml",
+            from_encoding=self.page_encoding,
+            parse_only=self.movie_cards,
+        )
 
-        for ratings in movie_ratings:
+    def _parse_list_page(self, parser: BeautifulSoup) -> None:
+        """Private method to get the movies of a single result page from Allociné.fr.
 
-            if "Presse" in ratings.text:
-                return float(
-                    re.sub(
-                        ",", ".", ratings.find("span", {"class": "stareval-note"}).text
-                    )
-                )
-        return None
+        Args:
+            parser (BeautifulSoup): Parser results of a Allocine.fr webpage.
+        """
 
-    def _get_movie_spec_rating(self, movie: bs4.element.Tag) -> Union[float, None]:
-        """Private method to retrieve the movie rating according to the spectators.
+        # iterate through each "movie" card
+        for movie in parser.find_all("li", recursive=False):
 
-        Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+            # store temporarly all the movie datas, one slot per column
+            movie_datas = [None] * len(self.movie_infos)
+            column = 0
 
-        Returns:
-            Union[float, None]: The movie rating according to the spectators.
-        """
+            # get every info we're interested in
+            for extract in EXTRACTORS:
 
-        # get all the available ratings
-        movie_ratings = movie.find_all("div", class_="rating-item")
+                # unavailable infos for some movies come back as None
+                scraped_info = extract(movie)
 
-        for ratings in movie_ratings:
+                # store the movie attribute(s) in their column(s)
+                if isinstance(scraped_info, tuple):
+                    next_column = column + len(scraped_info)
+                    movie_datas[column:next_column] = scraped_info
+                    column = next_column
+                else:
+                    movie_datas[column] = scraped_info
+                    column += 1
 
-            if "Spectateurs" in ratings.text:
-                return float(
-                    re.sub(
-                        ",", ".", ratings.find("span", {"class": "stareval-note"}).text
-                    )
-                )
+            # keep movie infos for the final dataframe
+            self._rows.append(movie_datas)
 
-        return None
+            # add movie infos to the csv file
+            self.dataset_writer.writerow(movie_datas)
+
+            # add movie infos to the postgres database
+            self._insert_movie_to_db(movie_datas)
+
+        # just to be safe, make sure the page hits the disk
+        self.dataset_file.flush()
+
+    def _save_movie_ids(self, movie_ids: List[int]) -> None:
+        """Private method to only save the movie IDs of a result page from Allociné.fr.
 
-    def _get_movie_summary(self, movie: bs4.element.Tag) -> str:
-        """Private method to retrieve the movie summary.
+        The postgres database is left untouched, so later full runs can still
+        insert these movies with all their informations.
 
         Args:
-            movie (bs4.element.Tag): Parser results with the movie informations.
+            movie_ids (List[int]): The movie IDs found on the page.
+        """
 
-        Returns:
-            str: The movie summary.
+        for movie_id in movie_ids:
+            movie_datas = [movie_id]
+            self._rows.append(movie_datas)
+            self.dataset_writer.writerow(movie_datas)
+
+        # just to be safe, make sure the page hits the disk
+        self.dataset_file.flush()
+
+    def _insert_movie_to_db(self, movie_datas: list) -> None:
+        """Private method to insert an individual movie to the postgres db.
+
+        Args:
+            movie_datas (list): The movie datas we just scraped.
         """
 
-        movie_summary = movie.find("div", {"class": "synopsis"}).text.strip()
+        self.db_cursor.execute(
+            """INSERT INTO public.movies
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT DO NOTHING
+            """,
+            tuple(movie_datas),
+        )
 
-        return movie_summary
+        self.db_conn.commit()
 
 
 if __name__ == "__main__":
@@ -392,6 +833,10 @@ if __name__ == "__main__":
         number_of_pages=int(os.getenv("NUM_PAGES")),
         dataset_name=os.getenv("DATASET_NAME"),
         human_pause=int(os.getenv("TIMEOUT")),
+        fast_ids=os.getenv("FAST_IDS", "false").lower() == "true",
     )
 
-    scraper.start_scraping_movies()
+    if os.getenv("ASYNC_SCRAPING", "false").lower() == "true":
+        asyncio.run(scraper.scrape_async())
+    else:
+        scraper.start_scraping_movies()